@@ -1,9 +1,26 @@
+import atexit
+import contextlib
+import gzip
+import hashlib
 import json
 import os
-from flask import Flask, request, render_template_string, redirect, url_for
-from openai import OpenAI
-from anthropic import Anthropic
-from data_filter import filter_activities
+import threading
+import time
+import orjson
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from flask import Flask, request, Response, make_response, redirect, stream_with_context, url_for
+from data_filter import build_fts_index, build_indexes, build_token_index, filter_activities_fast
+from llm_batcher import LLMBatcher
+from llm_clients import (
+    claude_async_client,
+    claude_client,
+    openai_async_client,
+    openai_client,
+)
+from semantic_cache import SemanticCache
 from usage_tracker import UsageTracker
 
 # Load environment variables from .env file (add this)
@@ -12,11 +29,22 @@ load_dotenv()
 
 # --- Configuration ---
 app = Flask(__name__)
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
 JSON_DB_FILE = "Activity.json"
 HISTORY_FILE = "question_history.json"
 
+
+@app.after_request
+def _static_cache_headers(resp):
+    # Static assets are fingerprinted via the ?v= query string, so they
+    # can be cached effectively forever; bump the version to invalidate.
+    if request.path.startswith("/static/"):
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
+
 # Available models
 AVAILABLE_MODELS = {
+    "gpt-4.1-nano": {"provider": "openai", "display": "GPT-4.1 Nano"},
     "gpt-4.1-mini": {"provider": "openai", "display": "GPT-4.1 Mini"},
     "gpt-4.1": {"provider": "openai", "display": "GPT-4.1"},
     "gpt-5-mini": {"provider": "openai", "display": "GPT-5 Mini"},
@@ -27,37 +55,292 @@ AVAILABLE_MODELS = {
 # Default model
 DEFAULT_MODEL = "gpt-4.1-mini"
 
+# Model cascade: simple lookups get answered by the cheap model (4x
+# cheaper than the default on both input and output); it escalates to
+# the requested model only when it reports low confidence. Set
+# MODEL_CASCADE=0 to always hit the requested model directly.
+CHEAP_MODEL = "gpt-4.1-nano"
+CASCADE_ENABLED = os.getenv("MODEL_CASCADE", "1").lower() not in ("0", "false", "no")
+_CASCADE_INSTRUCTION = (
+    "\nBefore answering, decide whether the records let you answer with high "
+    "confidence. If yes, prepend exactly 'CONFIDENT:' to your answer; "
+    "if not, reply with just 'UNSURE:'."
+)
+
+def _load_db(path: str) -> list:
+    """
+    Parse the activity dataset. A compressed sibling (Activity.json.gz,
+    produced with `gzip -k Activity.json`) takes precedence when
+    present: JSON compresses 5-10x, so the disk read shrinks
+    accordingly. Otherwise, if the optional pysimdjson package is
+    installed, parse straight out of an mmap (no read+copy into Python
+    bytes, multi-GB/s SIMD parser — worthwhile once the file reaches
+    tens of MB); else fall back to orjson on a plain read.
+    """
+    gz_path = path + ".gz"
+    if os.path.exists(gz_path):
+        with gzip.open(gz_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    try:
+        import mmap
+        import simdjson
+    except ImportError:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return simdjson.Parser().parse(mm).as_list()
+
+
 # --- Load Database ---
 try:
-    with open(JSON_DB_FILE, "r", encoding="utf-8") as f:
-        db = json.load(f)
+    db = _load_db(JSON_DB_FILE)
 except FileNotFoundError:
     print(f"WARNING: {JSON_DB_FILE} not found. App will start but queries may fail.")
     db = []
 
+# Fields the prompt actually needs. Source links, raw Organizations
+# blobs and internal labels only inflate billed input tokens without
+# helping the model answer.
+PROMPT_FIELDS = (
+    "ActivityTitle",
+    "Summary",
+    "Funders",
+    "SupportedOrganization",
+    "ActivityStatus",
+    "RegionLocation",
+    "Date",
+    "TypeOfSupport",
+    "AmountOfSupport",
+    "AmountOfSupportSplitted",
+    "CountriesSplitted",
+    "BeneficiariesExtracted",
+    "SocialCauses",
+    "SDGs",
+)
+
+
+def _project(record: dict) -> dict:
+    return {k: record[k] for k in PROMPT_FIELDS if k in record}
+
+
+# Serialize each record once at load time (projected to PROMPT_FIELDS);
+# ask_question re-assembles the prompt body by joining the pre-encoded
+# bytes instead of re-running a dumps over the same dicts per request.
+_RECORD_JSON = {id(r): orjson.dumps(_project(r)) for r in db}
+
+# Category buckets for the rule filters, plus the free-text fallback
+# indexes used by filter_activities_fast
+build_indexes(db)
+build_token_index(db)
+build_fts_index(db)
+
+# Dataset version for ETags: a ?q= response only changes if the
+# underlying file does.
+try:
+    DB_MTIME = int(os.path.getmtime(JSON_DB_FILE))
+except OSError:
+    try:
+        DB_MTIME = int(os.path.getmtime(JSON_DB_FILE + ".gz"))
+    except OSError:
+        DB_MTIME = 0
+
+
+# Cap on billed input tokens for the records payload, approximated at
+# ~4 bytes per token so we don't need a tokenizer dependency.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "8000"))
+
+
+def _records_json(records) -> bytes:
+    """
+    JSON array bytes for a list of db records, using the per-record
+    cache. Records are dropped from the end of the list (least relevant
+    under ranked filtering) until the payload fits the token budget.
+    """
+    parts = [_RECORD_JSON[id(r)] for r in records]
+    budget = PROMPT_TOKEN_BUDGET * 4
+    total = sum(len(p) + 1 for p in parts)
+    while len(parts) > 1 and total > budget:
+        total -= len(parts.pop()) + 1
+    return b"[" + b",".join(parts) + b"]"
+
+# --- Question History ---
+# Loaded once at startup and kept in memory; the previous version
+# re-read and re-wrote HISTORY_FILE on every request.
+HISTORY_LOCK = threading.Lock()
+try:
+    with open(HISTORY_FILE, "rb") as f:
+        HISTORY = deque(orjson.loads(f.read()), maxlen=10)
+except Exception:
+    HISTORY = deque(maxlen=10)
+
+# Newest-first view handed straight to the template; rebuilt only when
+# the history mutates, not on every render.
+HISTORY_VIEW = list(reversed(HISTORY))
+
+_history_dirty = threading.Event()
+
+
+def _write_history():
+    """Write HISTORY to disk atomically (temp file + os.replace)."""
+    with HISTORY_LOCK:
+        snapshot = list(HISTORY)
+    tmp_path = HISTORY_FILE + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(snapshot))
+        os.replace(tmp_path, HISTORY_FILE)
+    except Exception as e:
+        print(f"Error saving history: {e}")
+
+
+def _history_writer():
+    """
+    Daemon loop: wake on the dirty flag, sleep briefly to coalesce
+    bursts, then flush. Keeps all file I/O off the request path.
+    """
+    while True:
+        _history_dirty.wait()
+        time.sleep(1.0)
+        _history_dirty.clear()
+        _write_history()
+
+
+def _flush_history():
+    """Flush pending history on exit so the debounce can't drop it."""
+    if _history_dirty.is_set():
+        _history_dirty.clear()
+        _write_history()
+
+
+threading.Thread(target=_history_writer, daemon=True).start()
+atexit.register(_flush_history)
+
+
+def _record_history(question: str):
+    """Bump question to the top of the history and flag the writer."""
+    with HISTORY_LOCK:
+        if question in HISTORY:
+            HISTORY.remove(question)
+        HISTORY.append(question)
+        HISTORY_VIEW[:] = reversed(HISTORY)
+    _history_dirty.set()
+
+
 # --- Initialize Services ---
 usage_tracker = UsageTracker()
 
-# Initialize API clients
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-claude_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Cap in-flight LLM calls: queuing beyond the provider's sweet spot just
+# burns connections and invites 429 retries. Tunable via env for load
+# tests. The one semaphore is the whole budget — the streaming path
+# acquires it directly and the batcher shares it as its gate, so the
+# two paths combined can never exceed the cap.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_SEMA = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+llm_batcher = LLMBatcher(gate=LLM_SEMA)
+
+
+def _call_llm(fn):
+    """Run one provider call under the concurrency semaphore."""
+    with LLM_SEMA:
+        return fn()
+
+
+# Paraphrase-tolerant answer cache (cosine similarity over question
+# embeddings); sits behind the exact-match ANSWER_CACHE tier.
+semantic_cache = SemanticCache(openai_client)
 
 
 print("OPENAI_API_KEY:", bool(os.getenv("OPENAI_API_KEY")))
 print("ANTHROPIC_API_KEY:", bool(os.getenv("ANTHROPIC_API_KEY")))
 
 
+class _TTLCache:
+    """Minimal thread-safe TTL + LRU cache (keeps us off a cachetools dep)."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Full (answer, stats) results keyed by (question, model): repeat visits
+# and history clicks skip the LLM call entirely. Clear on DB reload.
+ANSWER_CACHE = _TTLCache(maxsize=512, ttl=3600)
+
+
+@dataclass(slots=True, frozen=True)
+class QuestionCtx:
+    """
+    A question normalized exactly once. The filter, the prompt builder
+    and every cache layer share these values, so cache keys stay
+    consistent and nobody re-strips/re-lowers per consumer.
+    """
+    raw: str
+    norm: str
+    lower: str
+    tokens: tuple
+
+    @classmethod
+    def from_raw(cls, raw: str) -> "QuestionCtx":
+        norm = raw.strip()
+        lower = norm.lower()
+        return cls(raw=raw, norm=norm, lower=lower, tokens=tuple(lower.split()))
+
+
 # --- Helper Functions ---
-def ask_question(question: str, model_name: str):
+# Record object -> position, so the filter cache can store small index
+# tuples instead of whole record dicts.
+_DB_INDEX = {id(r): i for i, r in enumerate(db)}
+
+
+@lru_cache(maxsize=256)
+def _filter_cached(q: str, db_id: int = 0):
     """
-    Returns a tuple: (answer_string, stats_dictionary)
+    Cached wrapper around filter_activities_fast, keyed on the
+    normalized question string plus id(db) so entries self-invalidate
+    if the db object is ever swapped out by a reload. Stores record
+    indices to keep the cache compact; repeat questions (history
+    clicks, reloads) skip the full scan.
     """
-    filtered = filter_activities(question, db)
+    return tuple(_DB_INDEX[id(r)] for r in filter_activities_fast(q, db))
+
+
+def _filtered_records(q: str) -> list:
+    return [db[i] for i in _filter_cached(q, id(db))]
 
-    if not filtered:
-        return "Not available in the dataset.", None
 
-    prompt = f"""
+# Static prompt pieces encoded once; only the records payload and the
+# question vary per request. Keeping the invariant prefix byte-identical
+# and first also maximizes provider-side prompt-prefix cache hits.
+_PROMPT_PREFIX = b"""
 You are a data analyst answering questions from a JSON dataset.
 
 Rules:
@@ -66,227 +349,157 @@ Rules:
 - If unsure, say "Not available in the dataset"
 
 Relevant Records:
-{json.dumps(filtered, ensure_ascii=False)}
+"""
+_PROMPT_MID = b"\n\nUser Question: "
+_PROMPT_SUFFIX = b"\n\nProvide a clear, factual answer.\n"
+
+
+def _build_prompt(question: str, filtered: list) -> str:
+    return b"".join((
+        _PROMPT_PREFIX,
+        _records_json(filtered),
+        _PROMPT_MID,
+        question.encode(),
+        _PROMPT_SUFFIX,
+    )).decode()
+
+
+def _call_stats(model_name: str, call: dict) -> dict:
+    """Stats dict for a usage_tracker call entry."""
+    model_info = AVAILABLE_MODELS[model_name]
+    return {
+        "provider": model_info["provider"],
+        "model": model_name,
+        "display_name": model_info["display"],
+        "input_tokens": call["input_tokens"],
+        "output_tokens": call["output_tokens"],
+        "total_tokens": call["total_tokens"],
+        "cost": call["cost_usd"]
+    }
+
+
+def _route_cheap(prompt: str):
+    """
+    First leg of the model cascade: ask CHEAP_MODEL, which must tag its
+    reply CONFIDENT: or UNSURE:. Returns (answer, stats) on a confident
+    answer, None when it punts (or errors) and the caller should
+    escalate to the requested model.
+    """
+    try:
+        call = lambda: openai_async_client.chat.completions.create(
+            model=CHEAP_MODEL,
+            messages=[{"role": "user", "content": prompt + _CASCADE_INSTRUCTION}]
+        )
+        response = llm_batcher.submit(CHEAP_MODEL, call).result()
+        answer = response.choices[0].message.content.strip()
+        # Track the routing call even when it escalates — it still cost tokens
+        call_entry = usage_tracker.record(response, CHEAP_MODEL, "route", "openai")
+        if not answer.startswith("CONFIDENT:"):
+            return None
+        stats = _call_stats(CHEAP_MODEL, call_entry) if call_entry else None
+        return answer[len("CONFIDENT:"):].strip(), stats
+    except Exception:
+        return None
+
+
+def ask_question(ctx: QuestionCtx, model_name: str):
+    """
+    Returns a tuple: (answer_string, stats_dictionary)
+    """
+    cache_key = (ctx.lower, model_name)
+    cached = ANSWER_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-User Question: {question}
+    cached = semantic_cache.lookup(ctx.lower)
+    if cached is not None:
+        return cached
 
-Provide a clear, factual answer.
-"""
+    filtered = _filtered_records(ctx.lower)
+
+    if not filtered:
+        return "Not available in the dataset.", None
+
+    prompt = _build_prompt(ctx.norm, filtered)
 
     try:
         model_info = AVAILABLE_MODELS[model_name]
         provider = model_info["provider"]
-        
+
+        # Model cascade: let the cheap model try first; most dataset
+        # lookups don't need the bigger model. Only for OpenAI targets,
+        # so an explicit Claude pick stays on Claude.
+        if CASCADE_ENABLED and provider == "openai" and model_name != CHEAP_MODEL:
+            routed = _route_cheap(prompt)
+            if routed is not None:
+                ANSWER_CACHE.set(cache_key, routed)
+                semantic_cache.add(ctx.lower, routed[0], routed[1])
+                return routed
+
         if provider == "openai":
             # OpenAI call
-            response = openai_client.chat.completions.create(
+            call = lambda: openai_async_client.chat.completions.create(
                 model=model_name,
                 messages=[{"role": "user", "content": prompt}]
             )
-            answer = response.choices[0].message.content
-
         elif provider == "claude":
             # Claude call
-            response = claude_client.messages.create(
+            call = lambda: claude_async_client.messages.create(
                 model=model_name,
                 max_tokens=4096,
                 messages=[{"role": "user", "content": prompt}]
             )
-            answer = response.content[0].text
         else:
             return "Invalid LLM provider configuration.", None
 
+        # Concurrent requests for the same model are grouped by the
+        # batcher and awaited together on its event loop instead of
+        # serializing round trips.
+        response = llm_batcher.submit(model_name, call).result()
+
+        if provider == "openai":
+            answer = response.choices[0].message.content
+        else:
+            answer = response.content[0].text
+
         # --- Usage Tracking ---
-        usage_tracker.record(response, model_name, "query", provider)
-        last_call = usage_tracker.calls[-1]
-        cost = usage_tracker.calculate_cost(last_call)
-
-        stats = {
-            "provider": provider,
-            "model": model_name,
-            "display_name": model_info["display"],
-            "input_tokens": last_call["input_tokens"],
-            "output_tokens": last_call["output_tokens"],
-            "total_tokens": last_call["total_tokens"],
-            "cost": cost
-        }
-
-        return answer.strip(), stats
+        call_entry = usage_tracker.record(response, model_name, "query", provider)
+        stats = _call_stats(model_name, call_entry) if call_entry else None
+
+        result = (answer.strip(), stats)
+        ANSWER_CACHE.set(cache_key, result)
+        semantic_cache.add(ctx.lower, result[0], stats)
+        return result
 
     except Exception as e:
         return f"Error calling AI API: {str(e)}", None
 
+
+def ask_many(questions, model_name: str = DEFAULT_MODEL):
+    """
+    Answer a batch of questions concurrently; for offline evaluation
+    runs. Returns (answer, stats) tuples in input order. The per-model
+    batcher groups the underlying API calls and awaits them together,
+    so a batch costs roughly one round trip instead of N.
+    """
+    if not questions:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(questions))) as ex:
+        return list(ex.map(
+            lambda q: ask_question(QuestionCtx.from_raw(q), model_name),
+            questions,
+        ))
+
+
 # --- HTML Template ---
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>JSON Analytics Q&A</title>
-    <style>
-        body { font-family: 'Segoe UI', Arial, sans-serif; background: #f4f6fa; margin: 0; padding: 0; display: flex; height: 100vh; }
-        
-        /* Sidebar */
-        .sidebar { width: 280px; background: #0b1f3b; color: white; padding: 25px; overflow-y: auto; display: flex; flex-direction: column; }
-        .sidebar h3 { margin-top: 0; border-bottom: 1px solid #1e3a5f; padding-bottom: 15px; font-size: 16px; text-transform: uppercase; letter-spacing: 1px; color: #8ba9d0; }
-        .sidebar a { display: block; color: #dbe6ff; text-decoration: none; padding: 10px 12px; margin-bottom: 5px; font-size: 14px; border-radius: 4px; transition: background 0.2s; }
-        .sidebar a:hover { background: #1e3a5f; color: white; }
-        
-        /* Content Area */
-        .content { flex: 1; padding: 40px; overflow-y: auto; }
-        .box { background: white; padding: 35px; border-radius: 10px; max-width: 800px; margin: 0 auto; box-shadow: 0 4px 15px rgba(0,0,0,0.05); }
-        
-        /* Header with Loader */
-        .header-container { display: flex; align-items: center; gap: 15px; margin-bottom: 20px; }
-        h2 { margin: 0; color: #333; }
-        
-        /* Loader Spinner */
-        .loader {
-            border: 4px solid #f3f3f3;
-            border-top: 4px solid #0b1f3b;
-            border-radius: 50%;
-            width: 20px;
-            height: 20px;
-            animation: spin 1s linear infinite;
-            display: none; /* Hidden by default */
-        }
-        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-        
-        /* Model Selector */
-        .model-selector {
-            margin-bottom: 15px;
-            padding: 12px;
-            background: #f8f9fa;
-            border-radius: 6px;
-            border: 1px solid #e9ecef;
-        }
-        .model-label {
-            font-size: 11px;
-            font-weight: 600;
-            color: #666;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            margin-bottom: 8px;
-            display: block;
-        }
-        .model-buttons {
-            display: flex;
-            gap: 6px;
-            flex-wrap: wrap;
-        }
-        .model-btn {
-            padding: 6px 12px;
-            border: none;
-            border-radius: 4px;
-            background: #e8e8e8;
-            cursor: pointer;
-            font-size: 11px;
-            font-weight: 500;
-            transition: all 0.2s;
-            color: #5a3a00;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.15), inset 0 1px 0 rgba(255,255,255,0.6);
-        }
-        .model-btn:hover {
-            background: #fff3e0;
-            transform: translateY(-1px);
-            box-shadow: 0 3px 6px rgba(0,0,0,0.2), inset 0 1px 0 rgba(255,255,255,0.6);
-        }
-        .model-btn.active {
-            background: #ffcc80;
-            color: #5a3a00;
-            box-shadow: inset 0 2px 5px rgba(0,0,0,0.25);
-        }
-        
-        /* Form Elements */
-        textarea { width: 100%; height: 100px; padding: 15px; border: 1px solid #ddd; border-radius: 6px; font-family: inherit; font-size: 15px; resize: vertical; box-sizing: border-box; }
-        textarea:focus { outline: none; border-color: #0b1f3b; }
-        
-        .button-group { margin-top: 15px; display: flex; gap: 10px; align-items: center; }
-        
-        button { background: #0b1f3b; color: white; padding: 10px 25px; border: none; border-radius: 5px; cursor: pointer; font-size: 15px; font-weight: 500; transition: background 0.2s; min-width: 100px;}
-        button:hover { background: #15335e; }
-        button:disabled { background: #ccc; cursor: not-allowed; }
-        
-        .clear-btn { background: #ffcc80; color: #5a3a00; text-decoration: none; padding: 10px 25px; border-radius: 5px; font-size: 15px; font-weight: 500; display: inline-block; border: none; cursor: pointer; }
-        .clear-btn:hover { background: #ffb74d; }
-        
-        /* Answer Section */
-        .answer-box { margin-top: 30px; border-top: 2px solid #f0f0f0; padding-top: 20px; }
-        .answer-content { white-space: pre-wrap; line-height: 1.6; color: #2d3748; }
-        
-        /* Usage Stats */
-        .stats-box { margin-top: 20px; background: #f8f9fa; border: 1px solid #e9ecef; border-radius: 6px; padding: 15px; font-size: 13px; color: #555; display: flex; justify-content: space-between; flex-wrap: wrap; gap: 15px; }
-        .stat-item { display: flex; flex-direction: column; }
-        .stat-label { font-weight: 600; color: #888; margin-bottom: 2px; text-transform: uppercase; font-size: 11px; }
-        .stat-value { font-family: monospace; font-size: 14px; color: #333; }
-    </style>
-    <script>
-        // Store selected model in localStorage
-        let selectedModel = localStorage.getItem('selectedModel') || '{{ default_model }}';
-        
-        // 1. Check for browser reload
-        if (window.performance) {
-            if (performance.navigation.type == 1) {
-                // Reload detected, redirect to clean home
-                window.location.href = "/";
-            }
-        }
-
-        function showLoader() {
-            document.getElementById('spinner').style.display = 'block';
-            
-            var answerBox = document.getElementById('answer-container');
-            if (answerBox) {
-                answerBox.style.display = 'none';
-            }
-
-            var btn = document.getElementById('askBtn');
-            btn.innerText = 'Processing...';
-            btn.disabled = true;
-        }
-        
-        function selectModel(modelName) {
-            selectedModel = modelName;
-            localStorage.setItem('selectedModel', modelName);
-            document.getElementById('selected_model').value = modelName;
-            
-            // Update button states
-            document.querySelectorAll('.model-btn').forEach(btn => {
-                btn.classList.remove('active');
-            });
-            document.querySelector(`[data-model="${modelName}"]`).classList.add('active');
-        }
-
-        // 2. Attach logic to history links
-        document.addEventListener("DOMContentLoaded", function() {
-            // Set initial model selection
-            document.getElementById('selected_model').value = selectedModel;
-            document.querySelector(`[data-model="${selectedModel}"]`).classList.add('active');
-            
-            var links = document.querySelectorAll('.sidebar a');
-            var textArea = document.querySelector('textarea[name="question"]');
-
-            links.forEach(function(link) {
-                link.addEventListener('click', function(e) {
-                    e.preventDefault(); // Prevent default navigation
-                    
-                    // Get text from link
-                    var questionText = this.innerText;
-                    
-                    // Update textarea INSTANTLY
-                    if(textArea) {
-                        textArea.value = questionText;
-                    }
-
-                    // Show loader
-                    showLoader();
-                    
-                    // Submit form with current selected model
-                    var form = document.querySelector('form');
-                    form.submit();
-                });
-            });
-        });
-    </script>
+    <link rel="stylesheet" href="{{ url_for('static', filename='app.css') }}?v=1">
+    <script>window.DEFAULT_MODEL = '{{ default_model }}';</script>
+    <script src="{{ url_for('static', filename='app.js') }}?v=1" defer></script>
 </head>
 <body>
 
@@ -319,7 +532,7 @@ HTML_TEMPLATE = """
             </div>
         </div>
         
-        <form method="post" action="/" onsubmit="showLoader()" autocomplete="off">
+        <form method="post" action="/" autocomplete="off">
             <input type="hidden" name="selected_model" id="selected_model" value="{{ selected_model }}">
             
             <!-- 3. Auto-select text on focus -->
@@ -332,37 +545,33 @@ HTML_TEMPLATE = """
             </div>
         </form>
 
-        {% if answer %}
-        <div id="answer-container" class="answer-box">
+        <div id="answer-container" class="answer-box" {% if not answer %}style="display:none;"{% endif %}>
             <h3>Answer</h3>
-            <div class="answer-content">{{ answer }}</div>
-            
-            {% if stats %}
-            <div class="stats-box">
+            <div id="answer-text" class="answer-content">{{ answer or "" }}</div>
+
+            <div id="stats-box" class="stats-box" {% if not stats %}style="display:none;"{% endif %}>
                 <div class="stat-item">
                     <span class="stat-label">Model</span>
-                    <span class="stat-value">{{ stats.display_name }}</span>
+                    <span class="stat-value" id="stat-model">{{ stats.display_name if stats else "" }}</span>
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Input Tokens</span>
-                    <span class="stat-value">{{ stats.input_tokens }}</span>
+                    <span class="stat-value" id="stat-input">{{ stats.input_tokens if stats else "" }}</span>
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Output Tokens</span>
-                    <span class="stat-value">{{ stats.output_tokens }}</span>
+                    <span class="stat-value" id="stat-output">{{ stats.output_tokens if stats else "" }}</span>
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Total Tokens</span>
-                    <span class="stat-value">{{ stats.total_tokens }}</span>
+                    <span class="stat-value" id="stat-total">{{ stats.total_tokens if stats else "" }}</span>
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Est. Cost</span>
-                    <span class="stat-value" style="color: green;">${{ stats.cost }}</span>
+                    <span class="stat-value" id="stat-cost" style="color: green;">{% if stats %}${{ stats.cost }}{% endif %}</span>
                 </div>
             </div>
-            {% endif %}
         </div>
-        {% endif %}
     </div>
 </div>
 
@@ -370,55 +579,188 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Compile the template once at import; render_template_string re-hashes
+# and re-looks-up the source on every request. Context that never
+# changes lives in the template globals rather than per-render kwargs.
+COMPILED_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+COMPILED_TEMPLATE.globals.update(
+    models=AVAILABLE_MODELS,
+    default_model=DEFAULT_MODEL,
+)
+
 # --- Routes ---
 @app.route("/", methods=["GET", "POST"])
 def home():
-    # 1. Load History
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                question_history = json.load(f)
-        except: question_history = []
-    else:
-        question_history = []
-
     answer = None
     stats = None
     question = ""
     selected_model = DEFAULT_MODEL
 
-    # 2. Logic
     if request.method == "POST":
         question = request.form.get("question", "").strip()
         selected_model = request.form.get("selected_model", DEFAULT_MODEL)
-        
+
         if question:
-            # Update history
-            if question in question_history: 
-                question_history.remove(question)
-            question_history.append(question)
-            question_history = question_history[-10:] # Keep last 10
-            
-            with open(HISTORY_FILE, "w") as f:
-                json.dump(question_history, f)
-            
+            ctx = QuestionCtx.from_raw(question)
+            _record_history(ctx.norm)
+
             # Get Answer & Stats
-            answer, stats = ask_question(question, selected_model)
+            answer, stats = ask_question(ctx, selected_model)
 
-    elif request.args.get("q"):
+    etag = None
+    if request.method == "GET" and request.args.get("q"):
         question = request.args.get("q")
-        answer, stats = ask_question(question, DEFAULT_MODEL)
 
-    return render_template_string(
-        HTML_TEMPLATE,
+        # The answer for a given (question, model, dataset version) is
+        # stable, so browser back/forward and history re-clicks can be
+        # served with 304 Not Modified without touching the LLM.
+        etag = hashlib.blake2b(
+            f"{question}|{DEFAULT_MODEL}|{DB_MTIME}".encode(),
+            digest_size=8,
+        ).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            return "", 304
+
+        answer, stats = ask_question(QuestionCtx.from_raw(question), DEFAULT_MODEL)
+        # The ETag is content-independent, so caching a failed call
+        # would keep revalidating the error page to 304 until the
+        # dataset file changes. Only cache real answers.
+        if stats is None:
+            etag = None
+
+    resp = make_response(COMPILED_TEMPLATE.render(
         question=question,
         answer=answer,
         stats=stats,
-        history=reversed(question_history),
-        models=AVAILABLE_MODELS,
-        default_model=DEFAULT_MODEL,
+        history=HISTORY_VIEW,
         selected_model=selected_model
-    )
+    ))
+    if etag:
+        resp.headers["ETag"] = etag
+        resp.headers["Cache-Control"] = "private, max-age=300"
+    return resp
+
+@app.route("/ask/stream")
+def ask_stream():
+    """
+    Server-Sent Events endpoint. Streams answer tokens as they arrive,
+    so the browser shows output at first-token latency instead of
+    waiting for the full completion. Emits `data:` events with a
+    JSON-encoded text delta, then a final `done` event carrying the
+    usage stats.
+    """
+    question = (request.args.get("q") or "").strip()
+    model_name = request.args.get("model", DEFAULT_MODEL)
+    if model_name not in AVAILABLE_MODELS:
+        model_name = DEFAULT_MODEL
+
+    ctx = QuestionCtx.from_raw(question) if question else None
+    if ctx:
+        _record_history(ctx.norm)
+
+    def _event(text):
+        return f"data: {json.dumps(text)}\n\n"
+
+    def generate():
+        if ctx is None:
+            yield "event: done\ndata: {}\n\n"
+            return
+
+        # Same cache tiers as ask_question: a hit replays as a single
+        # event instead of paying a fresh LLM call on every history
+        # click or repeat question.
+        cache_key = (ctx.lower, model_name)
+        cached = ANSWER_CACHE.get(cache_key)
+        if cached is None:
+            cached = semantic_cache.lookup(ctx.lower)
+        if cached is not None:
+            answer, stats = cached
+            yield _event(answer)
+            yield f"event: done\ndata: {json.dumps(stats or {})}\n\n"
+            return
+
+        filtered = _filtered_records(ctx.lower)
+        if not filtered:
+            yield _event("Not available in the dataset.")
+            yield "event: done\ndata: {}\n\n"
+            return
+
+        prompt = _build_prompt(ctx.norm, filtered)
+        provider = AVAILABLE_MODELS[model_name]["provider"]
+        parts = []
+
+        try:
+            # Model cascade, as in ask_question: probe the cheap model
+            # before opening the expensive stream. A confident answer is
+            # replayed as one event (it arrives faster than the big
+            # model's first token anyway); UNSURE falls through to the
+            # requested model's stream.
+            if CASCADE_ENABLED and provider == "openai" and model_name != CHEAP_MODEL:
+                routed = _route_cheap(prompt)
+                if routed is not None:
+                    answer, stats = routed
+                    ANSWER_CACHE.set(cache_key, routed)
+                    semantic_cache.add(ctx.lower, answer, stats)
+                    yield _event(answer)
+                    yield f"event: done\ndata: {json.dumps(stats or {})}\n\n"
+                    return
+
+            if provider == "openai":
+                stream = _call_llm(lambda: openai_client.chat.completions.create(
+                    model=model_name,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ))
+                usage_chunk = None
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield _event(chunk.choices[0].delta.content)
+                    if getattr(chunk, "usage", None):
+                        usage_chunk = chunk
+
+                stats = {}
+                if usage_chunk is not None:
+                    call_entry = usage_tracker.record(usage_chunk, model_name, "query", provider)
+                    if call_entry:
+                        stats = _call_stats(model_name, call_entry)
+            else:
+                # The request fires on entering the stream context, so
+                # that's what goes under the concurrency semaphore —
+                # same gate the OpenAI branch gets via _call_llm.
+                with contextlib.ExitStack() as es:
+                    stream = _call_llm(lambda: es.enter_context(
+                        claude_client.messages.stream(
+                            model=model_name,
+                            max_tokens=4096,
+                            messages=[{"role": "user", "content": prompt}],
+                        )
+                    ))
+                    for text in stream.text_stream:
+                        parts.append(text)
+                        yield _event(text)
+                    final = stream.get_final_message()
+
+                stats = {}
+                call_entry = usage_tracker.record(final, model_name, "query", provider)
+                if call_entry:
+                    stats = _call_stats(model_name, call_entry)
+
+            answer = "".join(parts).strip()
+            if answer:
+                ANSWER_CACHE.set(cache_key, (answer, stats or None))
+                semantic_cache.add(ctx.lower, answer, stats or None)
+
+            yield f"event: done\ndata: {json.dumps(stats)}\n\n"
+
+        except Exception as e:
+            yield _event(f"Error calling AI API: {str(e)}")
+            yield "event: done\ndata: {}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    # Dev server only; production runs under gunicorn (see Procfile/wsgi.py)
+    app.run(debug=bool(os.getenv("DEV")), port=5000)
@@ -0,0 +1,76 @@
+"""
+Offline bulk evaluation via the OpenAI Batch API.
+
+Large question sets don't need the live completions endpoint: routing
+them through /v1/batches costs half as much per token and draws from a
+separate rate pool, at the price of an up-to-24h completion window.
+The interactive web routes keep using the live API.
+"""
+
+import json
+import time
+
+from app_deploy import DEFAULT_MODEL, QuestionCtx, _build_prompt, _filtered_records
+from llm_clients import openai_client
+
+_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def ask_question_batch(questions, model_name: str = DEFAULT_MODEL,
+                       poll_interval: float = 30, timeout: float = 24 * 3600):
+    """
+    Answer a list of questions through the Batch API.
+
+    Builds the same per-question prompts as the web app (filtered,
+    projected records), uploads them as one JSONL file, and polls until
+    the batch finishes. Blocks for up to `timeout` seconds; returns
+    answers in input order, with None for any line that failed.
+    """
+    if not questions:
+        return []
+
+    lines = []
+    for i, question in enumerate(questions):
+        ctx = QuestionCtx.from_raw(question)
+        prompt = _build_prompt(ctx.norm, _filtered_records(ctx.lower))
+        lines.append(json.dumps({
+            "custom_id": f"q{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model_name,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        }))
+
+    batch_file = openai_client.files.create(
+        file=("questions.jsonl", "\n".join(lines).encode()),
+        purpose="batch",
+    )
+    batch = openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in _TERMINAL_STATUSES:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+        batch = openai_client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    answers = [None] * len(questions)
+    output = openai_client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        idx = int(result["custom_id"][1:])
+        choices = ((result.get("response") or {}).get("body") or {}).get("choices") or []
+        if choices:
+            answers[idx] = choices[0]["message"]["content"].strip()
+    return answers
@@ -1,34 +1,275 @@
+import json
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Question words too common to narrow the dataset down.
+_STOP_TOKENS = {
+    "the", "a", "an", "in", "of", "for", "to", "and", "or", "what",
+    "which", "who", "how", "many", "much", "is", "are", "was", "were",
+    "list", "show", "all", "with", "by", "on", "about", "activities",
+    "projects",
+}
+
+# Inverted index: token -> set of record indices. Built once at startup
+# via build_token_index; lets the fallback path intersect small posting
+# sets instead of scanning (or blindly capping) the whole db.
+_TOKEN_INDEX = {}
+_INDEXED_DB = None
+
+
+def _tokenize(text: str):
+    return _WORD_RE.findall(text.lower())
+
+
+def build_token_index(db: list):
+    """
+    Build the inverted index over every record's JSON text. Call once
+    after loading the db; filter_activities_fast uses it for queries
+    that no rule-based filter matches.
+    """
+    global _TOKEN_INDEX, _INDEXED_DB
+    index = defaultdict(set)
+    for i, record in enumerate(db):
+        for tok in set(_tokenize(json.dumps(record, ensure_ascii=False))):
+            index[tok].add(i)
+    _TOKEN_INDEX = dict(index)
+    _INDEXED_DB = db
+    return _TOKEN_INDEX
+
+
+@dataclass
+class ActivityIndexes:
+    """Category lookups built once over the db, values are record lists."""
+    status: dict       # "Executed" -> [records]
+    country: dict      # "ghana" -> [records], keys lowercased
+    beneficiary: dict  # "Women and Girls" -> [records]
+
+
+_INDEXES = None
+_CATEGORY_DB = None
+
+# Keyword router: one compiled alternation scanned once per question
+# instead of a cascade of `in` checks per keyword. Built alongside the
+# category indexes so every indexed country is routable.
+_KEYWORD_RE = None
+_KEYWORD_MAP = {}   # keyword -> (category, bucket value)
+
+
+def _build_keyword_router(indexes: "ActivityIndexes"):
+    global _KEYWORD_RE, _KEYWORD_MAP
+    mapping = {
+        "executed": ("status", "Executed"),
+        "planned": ("status", "Planned"),
+        "in progress": ("status", "In progress"),
+        "women": ("beneficiary", "Women and Girls"),
+    }
+    for name in indexes.country:
+        mapping.setdefault(name, ("country", name))
+    _KEYWORD_MAP = mapping
+    # Longest keywords first so "in progress" can't lose to a substring
+    pattern = "|".join(
+        re.escape(k) for k in sorted(mapping, key=len, reverse=True)
+    )
+    _KEYWORD_RE = re.compile(pattern)
+
+
+def build_indexes(db: list) -> ActivityIndexes:
+    """
+    Pre-bucket records by status, country and beneficiary so the rule
+    filters become dict lookups instead of per-request scans (country
+    names are lowercased here, once, rather than per record per query).
+    Call once after loading the db.
+    """
+    global _INDEXES, _CATEGORY_DB
+    status = defaultdict(list)
+    country = defaultdict(list)
+    beneficiary = defaultdict(list)
+    for record in db:
+        if record.get("ActivityStatus"):
+            status[record["ActivityStatus"]].append(record)
+        for c in record.get("CountriesSplitted", []):
+            value = c.get("value", "").lower()
+            if value:
+                country[value].append(record)
+        for b in record.get("BeneficiariesExtracted", []):
+            beneficiary[b].append(record)
+    _INDEXES = ActivityIndexes(dict(status), dict(country), dict(beneficiary))
+    _CATEGORY_DB = db
+    _build_keyword_router(_INDEXES)
+    return _INDEXES
+
+
+# In-memory SQLite FTS5 table for BM25-ranked free-text matching when
+# strict token intersection comes up empty. rowid is 1-based insertion
+# order, so record index = rowid - 1.
+_FTS_CONN = None
+_FTS_LOCK = threading.Lock()
+
+
+def build_fts_index(db: list):
+    """
+    Build the FTS5 full-text table. Call once after loading the db; a
+    no-op (returning None) if this SQLite lacks the FTS5 module.
+    """
+    global _FTS_CONN
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE activities USING fts5(title, summary, countries, body)"
+        )
+    except sqlite3.OperationalError:
+        conn.close()
+        _FTS_CONN = None
+        return None
+
+    rows = []
+    for record in db:
+        countries = " ".join(
+            c.get("value", "") for c in record.get("CountriesSplitted", [])
+        )
+        rows.append((
+            record.get("ActivityTitle", ""),
+            record.get("Summary", ""),
+            countries,
+            json.dumps(record, ensure_ascii=False),
+        ))
+    with conn:
+        conn.executemany("INSERT INTO activities VALUES (?,?,?,?)", rows)
+    _FTS_CONN = conn
+    return conn
+
+
+def _fts_search(q: str, db: list, limit: int = 50):
+    """BM25-ranked record lookup. Returns None if FTS is unavailable or empty."""
+    if _FTS_CONN is None:
+        return None
+    tokens = [t for t in set(_tokenize(q)) if t not in _STOP_TOKENS]
+    if not tokens:
+        return None
+    match = " OR ".join(tokens)
+    with _FTS_LOCK:
+        rows = _FTS_CONN.execute(
+            "SELECT rowid FROM activities WHERE activities MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit),
+        ).fetchall()
+    if not rows:
+        return None
+    return [db[r[0] - 1] for r in rows]
+
+
+def _rule_filter(q: str, db: list):
+    """
+    Keyword-routed filters. Returns None when no rule matches. With the
+    category indexes built (build_indexes), each match is a dict lookup
+    and mixed queries ("executed in ghana") intersect the buckets;
+    without them, the original per-query scans run.
+    """
+    selections = []
+
+    if db is _CATEGORY_DB and _INDEXES is not None and _KEYWORD_RE is not None:
+        # Single pass over the question; first keyword per category wins
+        hits = {}
+        for m in _KEYWORD_RE.finditer(q):
+            category, value = _KEYWORD_MAP[m.group(0)]
+            hits.setdefault(category, value)
+        if not hits:
+            return None
+        buckets = {
+            "status": _INDEXES.status,
+            "country": _INDEXES.country,
+            "beneficiary": _INDEXES.beneficiary,
+        }
+        selections = [buckets[c].get(v, []) for c, v in hits.items()]
+    else:
+        # --- Status filter ---
+        status = None
+        if "executed" in q:
+            status = "Executed"
+        elif "planned" in q:
+            status = "Planned"
+        elif "in progress" in q:
+            status = "In progress"
+        if status:
+            selections.append([a for a in db if a.get("ActivityStatus") == status])
+
+        # --- Country filter ---
+        for country in ["ghana", "nigeria", "kenya", "south africa"]:
+            if country in q:
+                selections.append([
+                    a for a in db
+                    if any(
+                        c.get("value", "").lower() == country
+                        for c in a.get("CountriesSplitted", [])
+                    )
+                ])
+                break
+
+        # --- Beneficiary filter ---
+        if "women" in q:
+            selections.append([
+                a for a in db
+                if "Women and Girls" in a.get("BeneficiariesExtracted", [])
+            ])
+
+    if not selections:
+        return None
+    result = selections[0]
+    for sel in selections[1:]:
+        keep = {id(a) for a in sel}
+        result = [a for a in result if id(a) in keep]
+    return result
+
+
 def filter_activities(question: str, db: list):
     q = question.lower()
 
-    # --- Status filter ---
-    if "executed" in q:
-        return [a for a in db if a.get("ActivityStatus") == "Executed"]
+    result = _rule_filter(q, db)
+    if result is not None:
+        return result
 
-    if "planned" in q:
-        return [a for a in db if a.get("ActivityStatus") == "Planned"]
+    # --- Fallback: cap dataset ---
+    return db[:50]   # safety cap
 
-    if "in progress" in q:
-        return [a for a in db if a.get("ActivityStatus") == "In progress"]
 
+def filter_activities_fast(question: str, db: list):
+    """
+    Like filter_activities, but when no rule matches, intersect posting
+    lists from the prebuilt inverted index instead of returning the
+    blind safety cap. Falls back to the cap if the index is missing or
+    no question token matches.
+    """
+    q = question.lower()
 
-    # --- Country filter ---
-    for country in ["ghana", "nigeria", "kenya", "south africa"]:
-        if country in q:
-            return [
-                a for a in db
-                if any(
-                    c.get("value", "").lower() == country
-                    for c in a.get("CountriesSplitted", [])
-                )
-            ]
-
-    # --- Beneficiary filter ---
-    if "women" in q:
-        return [
-            a for a in db
-            if "Women and Girls" in a.get("BeneficiariesExtracted", [])
+    result = _rule_filter(q, db)
+    if result is not None:
+        return result
+
+    if db is _INDEXED_DB and _TOKEN_INDEX:
+        postings = [
+            _TOKEN_INDEX[tok]
+            for tok in set(_tokenize(q))
+            if tok not in _STOP_TOKENS and tok in _TOKEN_INDEX
         ]
+        if postings:
+            # Intersect smallest-first so the working set shrinks fastest
+            postings.sort(key=len)
+            hits = set(postings[0])
+            for p in postings[1:]:
+                hits &= p
+                if not hits:
+                    break
+            if hits:
+                return [db[i] for i in sorted(hits)]
+
+    # All question tokens together matched nothing; try a BM25-ranked
+    # OR match before giving up on relevance entirely.
+    fts_result = _fts_search(q, db)
+    if fts_result is not None:
+        return fts_result
 
-    # --- Fallback: cap dataset ---
     return db[:50]   # safety cap
@@ -0,0 +1,90 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class LLMBatcher:
+    """
+    Small in-process batcher for LLM API calls.
+
+    Requests for the same model are pushed onto a per-model queue; a
+    background worker drains up to `max_batch` items (or whatever arrives
+    within `max_wait` seconds) and awaits them concurrently with
+    asyncio.gather on a dedicated event-loop thread. Under burst traffic
+    this amortizes connection/TLS/header overhead across requests instead
+    of paying N sequential round trips.
+
+    Callers submit zero-arg callables that return a coroutine (an async
+    SDK call) and get a Future back to block on, so the Flask request
+    handlers stay synchronous. In-flight calls are capped by `gate`, a
+    threading semaphore the app can share with its blocking call paths
+    so batched and streamed requests draw from one budget; without one,
+    a private semaphore sized `max_concurrency` is used.
+    """
+
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.02,
+                 max_concurrency: int = 8, gate: threading.Semaphore = None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._gate = gate if gate is not None else threading.BoundedSemaphore(max_concurrency)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+    def submit(self, model: str, call_fn) -> Future:
+        """
+        Enqueue call_fn (a zero-arg callable returning one API-call
+        coroutine) for the given model. Returns a Future resolving to
+        the API response.
+        """
+        fut = Future()
+        self._queue_for(model).put((call_fn, fut))
+        return fut
+
+    def _queue_for(self, model: str) -> queue.Queue:
+        with self._lock:
+            q = self._queues.get(model)
+            if q is None:
+                q = queue.Queue()
+                self._queues[model] = q
+                worker = threading.Thread(target=self._worker, args=(q,), daemon=True)
+                worker.start()
+            return q
+
+    def _worker(self, q: queue.Queue):
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        asyncio.run_coroutine_threadsafe(self._run_batch(batch), self._loop)
+
+    async def _run_batch(self, batch):
+        async def run_one(call_fn, fut: Future):
+            try:
+                # The gate is a threading semaphore (possibly shared
+                # with blocking paths), so acquire it off-loop; a full
+                # budget must not stall the event loop.
+                await self._loop.run_in_executor(None, self._gate.acquire)
+                try:
+                    result = await call_fn()
+                finally:
+                    self._gate.release()
+            except Exception as e:
+                fut.set_exception(e)
+            else:
+                fut.set_result(result)
+
+        await asyncio.gather(*(run_one(fn, fut) for fn, fut in batch))
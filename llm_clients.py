@@ -0,0 +1,35 @@
+import os
+import ssl
+
+# Current openai/anthropic releases transport over httpx2 and reject
+# httpx client instances; fall back to httpx only for environments
+# still pinned to the older SDK generations that require it.
+try:
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+from anthropic import Anthropic, AsyncAnthropic
+from openai import AsyncOpenAI, OpenAI
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Building an SSLContext costs ~10 ms and touches disk for the CA
+# bundle; do it exactly once and share it across every client instead
+# of paying it per construction.
+_ssl_ctx = ssl.create_default_context()
+
+_pool_limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# One pooled HTTP client per flavor, shared by both providers so TLS
+# sessions are kept alive across requests instead of re-handshaking.
+# The sync clients serve streaming/blocking paths; batched calls use
+# the async ones.
+http_client = httpx.Client(verify=_ssl_ctx, limits=_pool_limits, timeout=60)
+http_async_client = httpx.AsyncClient(verify=_ssl_ctx, limits=_pool_limits, timeout=60)
+
+openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+claude_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=http_client)
+openai_async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_async_client)
+claude_async_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=http_async_client)
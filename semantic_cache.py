@@ -0,0 +1,120 @@
+import atexit
+import os
+import pickle
+import re
+import threading
+
+import numpy as np
+
+EMBED_MODEL = "text-embedding-3-small"
+
+# Questions leaning on conversational context ("what about that one?")
+# must not be answered from a similarity hit on an earlier question.
+_CONTEXTUAL_RE = re.compile(r"\b(it|that|this|those|these|them|same|previous|above)\b")
+
+
+class SemanticCache:
+    """
+    Embedding-based answer cache for ask_question.
+
+    Exact (normalized) question matches are answered from a dict first;
+    otherwise the question is embedded once and compared against all
+    cached questions by cosine similarity (vectors are L2-normalized, so
+    a single matrix-vector product). A hit above `threshold` returns the
+    cached answer and stats, turning a multi-second LLM round trip into
+    milliseconds and zero token cost for paraphrased repeats.
+
+    The cache is pickled to disk at process exit and reloaded on start.
+    """
+
+    def __init__(self, client, threshold: float = 0.92, path: str = "semantic_cache.pkl"):
+        self.client = client
+        self.threshold = threshold
+        self.path = path
+        self.vecs = np.empty((0, 0), dtype=np.float32)
+        self.entries = []       # [{question, answer, stats}]
+        self._exact = {}        # question -> entries index
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+        atexit.register(self.save)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            self.vecs = data["vecs"]
+            self.entries = data["entries"]
+            self._exact = {e["question"]: i for i, e in enumerate(self.entries)}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"WARNING: could not load semantic cache: {e}")
+
+    def save(self):
+        if not self._dirty:
+            return
+        with self._lock:
+            data = {"vecs": self.vecs, "entries": list(self.entries)}
+            self._dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving semantic cache: {e}")
+
+    def _embed(self, question: str) -> np.ndarray:
+        resp = self.client.embeddings.create(model=EMBED_MODEL, input=question)
+        vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, question: str):
+        """
+        Return the cached (answer, stats) for a normalized question, or
+        None. Tries the exact map first, then cosine similarity.
+        """
+        with self._lock:
+            idx = self._exact.get(question)
+            if idx is not None:
+                entry = self.entries[idx]
+                return entry["answer"], entry["stats"]
+            have_entries = bool(self.entries)
+
+        if not have_entries or _CONTEXTUAL_RE.search(question):
+            return None
+
+        try:
+            emb = self._embed(question)
+        except Exception:
+            return None
+
+        with self._lock:
+            sims = self.vecs @ emb
+            best = int(sims.argmax())
+            if sims[best] >= self.threshold:
+                entry = self.entries[best]
+                return entry["answer"], entry["stats"]
+        return None
+
+    def add(self, question: str, answer: str, stats):
+        """Store a freshly answered question. Contextual questions are skipped."""
+        if _CONTEXTUAL_RE.search(question):
+            return
+        try:
+            emb = self._embed(question)
+        except Exception:
+            return
+
+        with self._lock:
+            if question in self._exact:
+                return
+            if self.vecs.size == 0:
+                self.vecs = emb[None, :]
+            else:
+                self.vecs = np.vstack([self.vecs, emb])
+            self._exact[question] = len(self.entries)
+            self.entries.append({"question": question, "answer": answer, "stats": stats})
+            self._dirty = True
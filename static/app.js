@@ -0,0 +1,112 @@
+// Store selected model in localStorage
+// window.DEFAULT_MODEL is set by a small inline bootstrap in the page
+let selectedModel = localStorage.getItem('selectedModel') || window.DEFAULT_MODEL;
+
+// 1. Check for browser reload
+if (window.performance) {
+    if (performance.navigation.type == 1) {
+        // Reload detected, redirect to clean home
+        window.location.href = "/";
+    }
+}
+
+function showLoader() {
+    document.getElementById('spinner').style.display = 'block';
+
+    var btn = document.getElementById('askBtn');
+    btn.innerText = 'Processing...';
+    btn.disabled = true;
+}
+
+function hideLoader() {
+    document.getElementById('spinner').style.display = 'none';
+
+    var btn = document.getElementById('askBtn');
+    btn.innerText = 'Ask Question';
+    btn.disabled = false;
+}
+
+function updateStats(stats) {
+    if (!stats || !stats.model) return;
+    document.getElementById('stat-model').innerText = stats.display_name;
+    document.getElementById('stat-input').innerText = stats.input_tokens;
+    document.getElementById('stat-output').innerText = stats.output_tokens;
+    document.getElementById('stat-total').innerText = stats.total_tokens;
+    document.getElementById('stat-cost').innerText = '$' + stats.cost;
+    document.getElementById('stats-box').style.display = 'flex';
+}
+
+// Stream the answer over Server-Sent Events so tokens appear as
+// they arrive instead of after the full completion.
+function streamQuestion() {
+    var textArea = document.querySelector('textarea[name="question"]');
+    var question = textArea.value.trim();
+    if (!question) return;
+
+    showLoader();
+    var content = document.getElementById('answer-text');
+    content.innerText = '';
+    document.getElementById('answer-container').style.display = 'block';
+    document.getElementById('stats-box').style.display = 'none';
+
+    var es = new EventSource('/ask/stream?q=' + encodeURIComponent(question)
+                             + '&model=' + encodeURIComponent(selectedModel));
+    es.onmessage = function(e) {
+        content.innerText += JSON.parse(e.data);
+    };
+    es.addEventListener('done', function(e) {
+        es.close();
+        hideLoader();
+        if (e.data) updateStats(JSON.parse(e.data));
+    });
+    es.onerror = function() {
+        es.close();
+        hideLoader();
+    };
+}
+
+function selectModel(modelName) {
+    selectedModel = modelName;
+    localStorage.setItem('selectedModel', modelName);
+    document.getElementById('selected_model').value = modelName;
+    
+    // Update button states
+    document.querySelectorAll('.model-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.querySelector(`[data-model="${modelName}"]`).classList.add('active');
+}
+
+// 2. Attach logic to history links
+document.addEventListener("DOMContentLoaded", function() {
+    // Set initial model selection
+    document.getElementById('selected_model').value = selectedModel;
+    document.querySelector(`[data-model="${selectedModel}"]`).classList.add('active');
+    
+    var links = document.querySelectorAll('.sidebar a');
+    var textArea = document.querySelector('textarea[name="question"]');
+
+    // Intercept the form and stream instead of a full-page POST
+    var form = document.querySelector('form');
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        streamQuestion();
+    });
+
+    links.forEach(function(link) {
+        link.addEventListener('click', function(e) {
+            e.preventDefault(); // Prevent default navigation
+
+            // Get text from link
+            var questionText = this.innerText;
+
+            // Update textarea INSTANTLY
+            if(textArea) {
+                textArea.value = questionText;
+            }
+
+            // Stream with current selected model
+            streamQuestion();
+        });
+    });
+});
@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime
 
 # ---- Model pricing (USD per 1M tokens) ----
@@ -164,25 +165,46 @@ MODEL_PRICING = {
 }
 
 
+# Per-token prices resolved once from the per-million table above, so
+# calculate_cost is two multiplies instead of a lookup plus divisions.
+_UNIT_PRICING = {
+    model: (prices["input"] / 1_000_000, prices["output"] / 1_000_000)
+    for model, prices in MODEL_PRICING.items()
+}
+
+
 class UsageTracker:
     def __init__(self):
         self.calls = []
         self.started_at = datetime.utcnow()
+        self._lock = threading.Lock()
+        # Running aggregates so summary() is O(1) however long the
+        # process has been serving.
+        self.total_input = 0
+        self.total_output = 0
+        self.total_tokens = 0
+        self.total_cost = 0.0
 
     def record(self, response, model: str, stage: str, provider: str = "openai"):
         """
         Records the token usage from an API response object.
         Supports both OpenAI and Claude response formats.
-        
+
         Args:
             response: API response object
             model: Model name/identifier
             stage: Stage of processing (e.g., "query", "filter")
             provider: API provider ("openai" or "claude")
+
+        Returns:
+            dict: The recorded call entry, or None if the response
+            carried no usage data. Callers running under a threaded
+            server should use this instead of reading calls[-1], which
+            can race with other requests.
         """
         usage = getattr(response, "usage", None)
         if not usage:
-            return
+            return None
 
         if provider == "openai":
             # OpenAI uses 'prompt_tokens' and 'completion_tokens'
@@ -195,16 +217,24 @@ class UsageTracker:
             output_tokens = usage.output_tokens
             total_tokens = input_tokens + output_tokens
         else:
-            return
+            return None
 
-        self.calls.append({
+        call = {
             "stage": stage,
             "model": model,
             "provider": provider,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "total_tokens": total_tokens
-        })
+        }
+        call["cost_usd"] = self.calculate_cost(call)
+        with self._lock:
+            self.calls.append(call)
+            self.total_input += input_tokens
+            self.total_output += output_tokens
+            self.total_tokens += total_tokens
+            self.total_cost += call["cost_usd"]
+        return call
 
     def calculate_cost(self, call):
         """
@@ -216,15 +246,12 @@ class UsageTracker:
         Returns:
             float: Cost in USD
         """
-        pricing = MODEL_PRICING.get(call["model"])
-        if not pricing:
-            # Return 0 if model not found in pricing
-            return 0.0
-        
-        # Pricing is per 1M tokens, so divide by 1,000,000
-        input_cost = (call["input_tokens"] / 1_000_000) * pricing["input"]
-        output_cost = (call["output_tokens"] / 1_000_000) * pricing["output"]
-        return round(input_cost + output_cost, 6)
+        # Unknown models cost 0
+        input_price, output_price = _UNIT_PRICING.get(call["model"], (0.0, 0.0))
+        return round(
+            call["input_tokens"] * input_price + call["output_tokens"] * output_price,
+            6,
+        )
 
     def summary(self):
         """
@@ -233,23 +260,16 @@ class UsageTracker:
         Returns:
             dict: Summary statistics including total tokens and costs
         """
-        total_input = sum(c["input_tokens"] for c in self.calls)
-        total_output = sum(c["output_tokens"] for c in self.calls)
-        total_tokens = sum(c["total_tokens"] for c in self.calls)
-        total_cost = sum(self.calculate_cost(c) for c in self.calls)
-
-        return {
-            "started_at": self.started_at.isoformat(),
-            "total_calls": len(self.calls),
-            "total_input_tokens": total_input,
-            "total_output_tokens": total_output,
-            "total_tokens": total_tokens,
-            "total_cost_usd": round(total_cost, 6),
-            "calls": [
-                {**c, "cost_usd": self.calculate_cost(c)}
-                for c in self.calls
-            ]
-        }
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "total_calls": len(self.calls),
+                "total_input_tokens": self.total_input,
+                "total_output_tokens": self.total_output,
+                "total_tokens": self.total_tokens,
+                "total_cost_usd": round(self.total_cost, 6),
+                "calls": list(self.calls)
+            }
 
     def print_detailed_report(self):
         """
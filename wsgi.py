@@ -0,0 +1,5 @@
+# Production entrypoint: gunicorn -w 1 --threads 32 wsgi:app (see Procfile).
+# Single worker on purpose: question history and the answer caches live
+# in-process, so extra workers would each serve their own stale copy and
+# clobber question_history.json on flush. Scale with threads instead.
+from app_deploy import app  # noqa: F401